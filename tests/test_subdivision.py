@@ -109,6 +109,17 @@ def test_subdivision_sine():
     expected_zeros = np.column_stack([X.flatten(), Y.flatten()])
     assert np.allclose(expected_zeros, zeros, atol=1e-4)
 
+def test_subdivision_sine_1d():
+    '''
+    Test case for the 1D solver on 10*sin(10x), whose zeros on [-1,1] are
+    k*pi/10 for k = -3, ..., 3. Guards the matrix/dct paths of
+    interval_approximate_1d, whose coefficient error must stay below the 1D
+    tolerance for the subdivision to terminate.
+    '''
+    zeros = np.sort(subdiv.solve(lambda x: 10*np.sin(10*x), -1, 1))
+    assert len(zeros) == 7
+    assert np.allclose(zeros, np.arange(-3, 4)*np.pi/10)
+
 def test_subdivision_solve_with_transform():
     '''
     The following tests will run subdivision.solve on relatively small random upper trianguler MultiPower.
@@ -242,3 +242,31 @@ def test_mon_combos():
             mons2.append(i)
     for i in range(len(mons)):
         assert((mons[i] == mons2[i]).all())
+
+def test_solve_small():
+    np.random.seed(0)
+
+    # Test Case #1 - the small cases and the fallback agree with np.linalg.solve
+    for dim in [2,3,4]:
+        for i in range(20):
+            A = np.random.randn(dim,dim)
+            B = np.random.randn(dim)
+            assert np.allclose(solve_small(A,B), np.linalg.solve(A,B))
+
+    # Test Case #2 - singular systems raise the same error as np.linalg.solve
+    for dim in [2,3]:
+        with pytest.raises(np.linalg.LinAlgError, match='Singular matrix'):
+            solve_small(np.ones((dim,dim)), np.ones(dim))
+
+    # Test Case #3 - ill-conditioned systems still have a backward stable
+    # solution, i.e. a residual on the order of machine epsilon
+    for dim in [2,3]:
+        for cond in [1e8,1e12]:
+            for i in range(20):
+                U = np.linalg.qr(np.random.randn(dim,dim))[0]
+                V = np.linalg.qr(np.random.randn(dim,dim))[0]
+                A = U@np.diag(np.logspace(0,-np.log10(cond),dim))@V.T
+                B = np.random.randn(dim)
+                X = solve_small(A,B)
+                residual = np.linalg.norm(A@X-B)
+                assert residual < 1e-14*(np.linalg.norm(A,2)*np.linalg.norm(X) + np.linalg.norm(B))
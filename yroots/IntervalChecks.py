@@ -8,9 +8,7 @@ import numpy as np
 from itertools import product
 import itertools
 from yroots.polynomial import MultiCheb
-from matplotlib import pyplot as plt
 from yroots.polynomial import MultiCheb, Polynomial
-from matplotlib import patches
 from scipy import linalg as la
 from math import fabs                      # faster than np.abs for small arrays
 from yroots.utils import memoize, transform, get_var_list, isNumber
@@ -202,10 +200,9 @@ class IntervalData:
             temp1 = b - a
             temp2 = b + a
 
-            #Create the new intervals based on the ones we are keeping
-            newIntervals = self.subintervals.copy()
-            newIntervals[:,:1,:] = (newIntervals[:,:1,:] * temp1 + temp2) / 2
-            newIntervals[:,1:,:] = (newIntervals[:,1:,:] * temp1 + temp2) / 2
+            #Create the new intervals based on the ones we are keeping.
+            #Both bounds of every subinterval are transformed in one broadcast.
+            newIntervals = (self.subintervals * temp1 + temp2) / 2
 
             thrownOuts = []
             if runChecks:
@@ -327,6 +324,8 @@ class IntervalData:
         #3D plot with small alpha, matplotlib interactive, animation
         #make logo
         #make easier to input lower/upper bounds as a list
+        from matplotlib import pyplot as plt
+        from matplotlib import patches
         plt.figure(dpi=600)
         fig,ax = plt.subplots(1)
         fig.set_size_inches(6.5, 3)
@@ -345,9 +344,8 @@ class IntervalData:
         X,Y = np.meshgrid(x,y)
         for i in range(dim):
             if isinstance(funcs[i], Polynomial):
-                Z = np.zeros_like(X)
-                for spot,num in np.ndenumerate(X):
-                    Z[spot] = funcs[i]([X[spot],Y[spot]])
+                # evaluate_grid is indexed [x, y] but the meshgrid is indexed [y, x]
+                Z = funcs[i].evaluate_grid(np.column_stack([x, y])).T
                 plt.contour(X,Y,Z,levels=[0],colors=contour_colors[i])
             else:
                 plt.contour(X,Y,funcs[i](X,Y),levels=[0],colors=contour_colors[i])
@@ -26,10 +26,18 @@ class RootTracker:
     ----------
     roots: numpy array
         The roots of the system being solved
+    root_list : list
+        The roots that have been found. They are only stacked into the roots
+        array when it is accessed, so adding a root doesn't copy the others.
     possible_duplicates : list
         Roots that were outside their search interval so might be duplicates
     potential_roots : numpy array
         Places that may or may not have a root that we found.
+    potential_root_list : list
+        The potential roots that have been found, stacked into potential_roots
+        when it is accessed.
+    dim : int
+        The dimension of the roots. None until a root is added.
     intervals : list
         The intervals that the roots were found in.
     polish_intervals : list
@@ -51,15 +59,46 @@ class RootTracker:
         Gets the intervals to run the next round of polishing on.
     '''
     def __init__(self):
-        self.roots = np.array([])
+        self.root_list = []
         self.possible_duplicates = []
-        self.potential_roots = np.array([])
+        self.potential_root_list = []
+        self.dim = None
         self.intervals = []
         self.methods = []
         #for tracking condition numbers and gradients
         self.conds = []
         self.grads = []
 
+    @property
+    def roots(self):
+        return self._stack(self.root_list)
+
+    @property
+    def potential_roots(self):
+        return self._stack(self.potential_root_list)
+
+    def _stack(self, root_list):
+        ''' Stacks a list of roots into an array with one root per row, or a flat
+        array of roots in one dimension.
+
+        Parameters
+        ----------
+        root_list : list
+            The roots to stack.
+
+        Returns
+        -------
+        roots : numpy array
+            The stacked roots.
+        '''
+        if len(root_list) == 0:
+            if self.dim is None or self.dim == 1:
+                return np.zeros([0])
+            return np.zeros([0, self.dim])
+        if self.dim > 1:
+            return np.vstack(root_list)
+        return np.hstack(root_list)
+
     def add_roots(self, zeros, a, b, method):
         ''' Store the roots that were found, along with the interval they were found in and the method used.
 
@@ -127,18 +166,10 @@ class RootTracker:
             The method used to find the roots
         '''
         if not isinstance(a, np.ndarray):
-            dim = 1
-        else:
-            dim = len(a)
-        if len(self.roots) == 0:
-            if dim == 1:
-                self.roots = np.zeros([0])
-            else:
-                self.roots = np.zeros([0,dim])
-        if dim > 1:
-            self.roots = np.vstack([self.roots, zero])
+            self.dim = 1
         else:
-            self.roots = np.hstack([self.roots, zero])
+            self.dim = len(a)
+        self.root_list.append(zero)
         self.intervals += [(a,b)]
         self.methods += [method]
 
@@ -158,19 +189,10 @@ class RootTracker:
             The method used to find the roots
         '''
         if not isinstance(a, np.ndarray):
-            dim = 1
-        else:
-            dim = len(a)
-        if len(self.potential_roots) == 0:
-            if dim == 1:
-                self.potential_roots = np.zeros([0])
-            else:
-                self.potential_roots = np.zeros([0,dim])
-
-        if dim > 1:
-            self.potential_roots = np.vstack([self.potential_roots, potentials])
+            self.dim = 1
         else:
-            self.potential_roots = np.hstack([self.potential_roots, potentials])
+            self.dim = len(a)
+        self.potential_root_list.append(potentials)
         self.intervals += [(a,b)]*len(potentials)
         self.methods += [method]*len(potentials)
 
@@ -186,7 +208,7 @@ class RootTracker:
         '''
         polish_intervals = np.unique(self.intervals,axis=0)
         self.intervals = []
-        self.roots = []
+        self.root_list = []
         self.methods = []
         return polish_intervals
 
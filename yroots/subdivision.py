@@ -7,25 +7,28 @@ the approximation degree is small enough to be solved efficiently.
 """
 
 import numpy as np
-from scipy.fftpack import fftn
+from scipy.fft import dct, dctn
 from yroots.OneDimension import divCheb, divPower, multCheb, multPower
 from yroots.Multiplication import multiplication
 from yroots.utils import clean_zeros_from_matrix, slice_top, MacaulayError, \
                          get_var_list, ConditioningError, TooManyRoots, \
-                         Tolerances, solve_linear, memoize, Memoize, transform
+                         Tolerances, solve_linear, memoize, transform
 from yroots.polynomial import MultiCheb
 from yroots.IntervalChecks import IntervalData
 from yroots.RootTracker import RootTracker
-from itertools import product
-from matplotlib import pyplot as plt
+from collections import deque
 from scipy.linalg import lu
-import time
 import warnings
 from numba import jit
 from math import log2, ceil
 
 macheps = 2.220446049250313e-16
 
+# Largest degree for which interval_approximate_1d uses a cosine matrix instead
+# of the dct. Timed against scipy.fft.dct: the matrix is about 7x faster up to
+# degree 64 and still ahead at degree 200, but slower from degree 250 on.
+max_matrix_dct_deg = 200
+
 def solve(funcs, a, b, rel_approx_tol=1.e-15, abs_approx_tol=1.e-12,
           max_cond_num=1e5, good_zeros_factor=100, min_good_zeros_tol=1e-5,
           check_eval_error=True, check_eval_freq=1, plot=False,
@@ -122,9 +125,14 @@ def solve(funcs, a, b, rel_approx_tol=1.e-15, abs_approx_tol=1.e-12,
         raise ValueError('`funcs` must be a callable or list of callables.')
 
 
-    # make a and b the right type
-    a = np.float64(a)
-    b = np.float64(b)
+    # make a and b the right type: scalars in 1D, contiguous float64 arrays
+    # otherwise so the interval arithmetic downstream never has to convert
+    if dim == 1:
+        a = np.float64(a)
+        b = np.float64(b)
+    else:
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        b = np.ascontiguousarray(b, dtype=np.float64)
 
     # Choose an appropriate max degree for the given dimension if none is specified.
     if deg is None:
@@ -149,11 +157,9 @@ def solve(funcs, a, b, rel_approx_tol=1.e-15, abs_approx_tol=1.e-12,
                       target_tol=target_tol)
     tols.nextTols()
 
-    # Set up the interval data and root tracker classes and cheb blocky copy arr
+    # Set up the interval data and root tracker classes
     interval_data = IntervalData(a, b, intervalReductions)
     root_tracker = RootTracker()
-    values_arr.memo = {}
-    initialize_values_arr(dim, 2*(deg+3))
 
     if dim == 1:
         # In one dimension, we don't use target_deg; it's the same as deg
@@ -192,6 +198,7 @@ def solve(funcs, a, b, rel_approx_tol=1.e-15, abs_approx_tol=1.e-12,
     # Plotting
     if plot:
         if dim == 1:
+            from matplotlib import pyplot as plt
             x = np.linspace(a, b, 1000)
             plt.plot(x, funcs(x), color='k')
             plt.plot(np.real(root_tracker.roots), np.zeros(len(root_tracker.roots)), 'o', color = 'none', markeredgecolor='r')
@@ -207,92 +214,15 @@ def solve(funcs, a, b, rel_approx_tol=1.e-15, abs_approx_tol=1.e-12,
     else:
         return root_tracker.roots
 
-@Memoize
-def initialize_values_arr(dim, deg):
-    """Helper function for chebyshev_block_copy.
-    Initializes an array to use throughout the whole solve function.
-    Builds one array corresponding to dim and deg that can be used for any
-    block copy of degree less than deg
-
-    Parameters
-    ----------
-    dim : int
-        Dimension
-    deg : int
-        Degree
-
-    Returns
-    -------
-    An empty numpy array that can be used to hold values for a chebyshev_block_copy
-    of dimension dim degree < deg.
-    """
-    return np.empty(tuple([2*deg])*dim, dtype=np.float64)
-
-@Memoize
-def values_arr(dim):
-    """Helper function for chebyshev_block_copy.
-    Finds the array initialized by initialize_values_arr for dimension dim.
-    Assumes the degree of the approximation is less than the degree used for
-    initialize_values_arr.
-
-    Parameters
-    ----------
-    dim : int
-        Dimension
-
-    Returns
-    -------
-    An empty numpy array that can be used to hold values for a chebyshev_block_copy
-    of dimension dim and degree less than the degree used for initialize_values_arr.
-    """
-    keys = tuple(initialize_values_arr.memo.keys())
-    for idx, k in enumerate(keys):
-        if k[0]==dim:
-            break
-    return initialize_values_arr.memo[keys[idx]]
-
-@memoize
-def block_copy_slicers(dim, deg):
-    """Helper function for chebyshev_block_copy.
-    Builds slice objects to index into the evaluation array to copy
-    in preparation for the fft.
-
-    Parameters
-    ----------
-    dim : int
-        Dimension
-    dim : int
-        Degree of approximation
-
-    Returns
-    -------
-    block_slicers : list of tuples of slice objects
-        Slice objects used to index into the evaluations
-    cheb_slicers : list of tuples of slice objects
-        Slice objects used to index into the array we're copying evaluations to
-    slicer : tuple of slice objets
-        Used to index into the portion of that array we're using for the fft input
-    """
-    block_slicers = []
-    cheb_slicers = []
-    full_arr_deg = 2*deg
-    for block in product([False, True], repeat=dim):
-        cheb_idx = [slice(0, deg+1)]*dim
-        block_idx = [slice(0, full_arr_deg)]*dim
-        for i, flip_dim in enumerate(block):
-            if flip_dim:
-                cheb_idx[i] = slice(deg+1, full_arr_deg)
-                block_idx[i] = slice(deg-1, 0, -1)
-        block_slicers.append(tuple(block_idx))
-        cheb_slicers.append(tuple(cheb_idx))
-    return block_slicers, cheb_slicers, tuple([slice(0, 2*deg)]*dim)
-
 def chebyshev_block_copy(values_block):
     """This functions helps avoid double evaluation of functions at
     interpolation points. It takes in a tensor of function evaluation values
     and copies these values to a new tensor appropriately to prepare for
     chebyshev interpolation.
 
+    The mirror is built one dimension at a time, so only dim concatenations
+    are needed instead of 2**dim block copies.
+
     Parameters
     ----------
     values_block : numpy array
@@ -303,23 +233,16 @@ def chebyshev_block_copy(values_block):
       chebyshev interpolation values
     """
     dim = values_block.ndim
-    deg = values_block.shape[0] - 1
-    values_cheb = values_arr(dim)
-    block_slicers, cheb_slicers, slicer = block_copy_slicers(dim, deg)
-
-    for cheb_idx, block_idx in zip(cheb_slicers, block_slicers):
-        try:
-            values_cheb[cheb_idx] = values_block[block_idx]
-        except ValueError as e:
-            if str(e)[:42] == 'could not broadcast input array from shape':
-                values_arr.memo[(dim, )] = np.empty(tuple([2*deg])*dim, dtype=np.float64)
-                values_cheb = values_arr(dim)
-                values_cheb[cheb_idx] = values_block[block_idx]
-            else:
-                raise ValueError(e)
-    return values_cheb[slicer]
-
-def interval_approximate_1d(f, a, b, deg, return_bools=False, return_inf_norm=False):
+    values_cheb = values_block
+    for d in range(dim):
+        # Reflect the interior points along dimension d
+        mirror = [slice(None)]*dim
+        mirror[d] = slice(values_block.shape[d] - 2, 0, -1)
+        values_cheb = np.concatenate([values_cheb, values_cheb[tuple(mirror)]], axis=d)
+    return values_cheb
+
+def interval_approximate_1d(f, a, b, deg, return_bools=False, return_inf_norm=False,
+                            values=None):
     """Finds the chebyshev approximation of a one-dimensional function on an
     interval.
 
@@ -335,6 +258,9 @@ def interval_approximate_1d(f, a, b, deg, return_bools=False, return_inf_norm=Fa
         The degree of the interpolation.
     return_inf_norm : bool
         Whether to return the inf norm of the function
+    values : numpy array (optional)
+        The values of f at the deg+1 chebyshev extrema on [a, b]. If given, f
+        is not evaluated again.
     Returns
     -------
     coeffs : numpy array
@@ -342,25 +268,105 @@ def interval_approximate_1d(f, a, b, deg, return_bools=False, return_inf_norm=Fa
     inf_norm : float
         The inf_norm of the function
     """
-    extrema = transform(np.cos((np.pi*np.arange(2*deg))/deg), a, b)
-    values = f(extrema)
+    if values is None:
+        extrema = transform(get_cheb_values(deg), a, b)
+        values = f(extrema)
 
     if return_inf_norm:
         inf_norm = np.max(np.abs(values))
 
-    coeffs = np.real(np.fft.fft(values/deg))
-    coeffs[0]/=2
-    coeffs[deg]/=2
+    if deg <= max_matrix_dct_deg:
+        coeffs = get_cheb_coeff_matrix(deg) @ values
+    else:
+        # The DCT-I of the deg+1 values is the fft of their even extension
+        coeffs = dct(values, type=1)/deg
+        coeffs[0]/=2
+        coeffs[deg]/=2
 
     if return_bools:
         # Check to see if the sign changes on the interval
-        is_positive = values > 0
-        sign_change = any(is_positive) and any(~is_positive)
-        if return_inf_norm: return coeffs[:deg+1], sign_change, inf_norm
-        else:               return coeffs[:deg+1], sign_change
+        sign_change = has_sign_change(values)
+        if return_inf_norm: return coeffs, sign_change, inf_norm
+        else:               return coeffs, sign_change
     else:
-        if return_inf_norm: return coeffs[:deg+1], inf_norm
-        else:               return coeffs[:deg+1]
+        if return_inf_norm: return coeffs, inf_norm
+        else:               return coeffs
+
+@jit(nopython=True, cache=True)
+def has_sign_change(values):
+    """Helper function for interval_approximate_1d. Checks if some of the values
+    are positive and some aren't, stopping as soon as both have been seen.
+
+    Parameters
+    ----------
+    values : numpy array
+        The function values to check.
+
+    Returns
+    -------
+    has_sign_change : bool
+        Whether some values are positive and some are not.
+    """
+    positive = False
+    not_positive = False
+    for value in values:
+        if value > 0:
+            positive = True
+        else:
+            not_positive = True
+        if positive and not_positive:
+            return True
+    return False
+
+@memoize
+def get_cheb_coeff_matrix(deg):
+    """Helper function for interval_approximate_1d. Builds the matrix that maps
+    the values at the chebyshev extrema to the chebyshev coefficients. For small
+    degrees one matrix product is faster than the dct.
+
+    Parameters
+    ----------
+    deg : int
+        The interpolation degree.
+
+    Returns
+    -------
+    matrix : numpy array
+        The (deg+1, deg+1) matrix of the scaled DCT-I, including halving the
+        first and last coefficients. The array is read-only since it is shared
+        between calls.
+    """
+    k = np.arange(deg+1)
+    # cos(pi*j*k/deg) has period 2*deg in j*k. Reducing first keeps the
+    # arguments small, which makes the entries accurate to the last bit.
+    matrix = np.cos(np.pi*(np.outer(k, k) % (2*deg))/deg)
+    # Interior values are counted twice in the even extension
+    matrix[:, 1:deg] *= 2
+    matrix[0] /= 2
+    matrix[deg] /= 2
+    matrix /= deg
+    matrix.setflags(write=False)
+    return matrix
+
+@memoize
+def get_cheb_values(deg):
+    """Helper function for interval_approximate_1d and get_cheb_grid. Since this is memoized, the
+    cosines are only computed once per degree.
+
+    Parameters
+    ----------
+    deg : int
+        The interpolation degree.
+
+    Returns
+    -------
+    cheb_values : numpy array
+        The deg+1 Chebyshev extrema cos(pi*k/deg) on [-1, 1]. The array is
+        read-only since it is shared between calls.
+    """
+    cheb_values = np.cos(np.arange(deg+1)*np.pi/deg)
+    cheb_values.setflags(write=False)
+    return cheb_values
 
 @memoize
 def get_cheb_grid(deg, dim, has_eval_grid):
@@ -379,16 +385,16 @@ def get_cheb_grid(deg, dim, has_eval_grid):
         The chebyshev grid used to evaluate the functions in
         interval_approximate_nd
     """
+    cheb_values = get_cheb_values(deg)
     if has_eval_grid:
-        cheb_values = np.cos(np.arange(deg+1)*np.pi/deg)
         return np.column_stack([cheb_values]*dim)
     else:
-        cheb_values = np.cos(np.arange(deg+1)*np.pi/deg)
         cheb_grids = np.meshgrid(*([cheb_values]*dim), indexing='ij')
         flatten = lambda x: x.flatten()
         return np.column_stack(tuple(map(flatten, cheb_grids)))
 
-def interval_approximate_nd(f, a, b, deg, return_inf_norm=False):
+def interval_approximate_nd(f, a, b, deg, return_inf_norm=False,
+                            values_block=None, return_values=False):
     """Finds the chebyshev approximation of an n-dimensional function on an
     interval.
 
@@ -404,6 +410,11 @@ def interval_approximate_nd(f, a, b, deg, return_inf_norm=False):
         The degree of the interpolation in each dimension.
     return_inf_norm : bool
         whether to return the inf norm of the function
+    values_block : numpy array (optional)
+        The values of f on the degree deg chebyshev grid on [a, b]. If given,
+        f is not evaluated again.
+    return_values : bool
+        whether to return the values of f on the chebyshev grid
 
     Returns
     -------
@@ -411,40 +422,42 @@ def interval_approximate_nd(f, a, b, deg, return_inf_norm=False):
         The coefficient of the chebyshev interpolating polynomial.
     inf_norm : float
         The inf_norm of the function
+    values_block : numpy array
+        The values of f on the chebyshev grid
     """
     dim = len(a)
     if dim != len(b):
         raise ValueError("Interval dimensions must be the same!")
 
-    if hasattr(f, "evaluate_grid"):
-        cheb_points = transform(get_cheb_grid(deg, dim, True), a, b)
-        values_block = f.evaluate_grid(cheb_points)
-    else:
-        cheb_points = transform(get_cheb_grid(deg, dim, False), a, b)
-        values_block = f(*cheb_points.T).reshape(*([deg+1]*dim))
-
-    values = chebyshev_block_copy(values_block)
+    if values_block is None:
+        if hasattr(f, "evaluate_grid"):
+            cheb_points = transform(get_cheb_grid(deg, dim, True), a, b)
+            values_block = f.evaluate_grid(cheb_points)
+        else:
+            cheb_points = transform(get_cheb_grid(deg, dim, False), a, b)
+            values_block = f(*cheb_points.T).reshape(*([deg+1]*dim))
 
     if return_inf_norm:
         inf_norm = np.max(np.abs(values_block))
 
-    x0_slicer, deg_slicer, slices, rescale = interval_approx_slicers(dim, deg)
-    coeffs = fftn(values/rescale).real
-    for x0sl, degsl in zip(x0_slicer, deg_slicer):
-        # halve the coefficients in each slice
-        coeffs[x0sl] /= 2
-        coeffs[degsl] /= 2
+    # The DCT-I of the values is the fft of their chebyshev_block_copy, without
+    # needing to build the mirrored tensor
+    coeffs = dctn(values_block, type=1)
+    coeffs *= interval_approx_weights(dim, deg)
 
     if return_inf_norm:
-        return coeffs[tuple(slices)], inf_norm
+        if return_values: return coeffs, inf_norm, values_block
+        else:             return coeffs, inf_norm
     else:
-        return coeffs[tuple(slices)]
+        if return_values: return coeffs, values_block
+        else:             return coeffs
 
 @memoize
-def interval_approx_slicers(dim, deg):
-    """Helper function for interval_approximate_nd. Builds slice objects to index
-    into the output of the fft and divide some of the values by 2 and turn them into
-    coefficients of the approximation.
+def interval_approx_weights(dim, deg):
+    """Helper function for interval_approximate_nd. Builds the tensor that
+    rescales the output of the dct and divides the coefficients on the first and
+    last hyperplane of each dimension by 2, turning them into coefficients of
+    the approximation in a single multiplication.
 
     Parameters
     ----------
@@ -455,23 +468,21 @@ def interval_approx_slicers(dim, deg):
 
     Returns
     -------
-    x0_slicer : list of tuples of slice objects
-        Slice objects used to index into the the degree 1 monomials
-    deg_slicer : list of tuples of slice objects
-        Slice objects used to index into the the degree d monomials
-    slices : tuple of slice objets
-        Used to index into the portion of the array that are coefficients
-    rescale : int
-        amount to rescale the evaluations by in order to feed them into the fft
+    weights : numpy array
+        The outer product of dim copies of [1/2, 1, ..., 1, 1/2]/deg. The array
+        is read-only since it is shared between calls.
     """
-    x0_slicer = [tuple([slice(None) if i != d else 0 for i in range(dim)])
-                  for d in range(dim)]
-    deg_slicer = [tuple([slice(None) if i != d else deg for i in range(dim)])
-                  for d in range(dim)]
-    slices = tuple([slice(0, deg+1)]*dim)
-    return x0_slicer, deg_slicer, slices, deg**dim
-
-def full_cheb_approximate(f, a, b, deg, abs_approx_tol, rel_approx_tol, good_deg=None):
+    weights_1d = np.ones(deg+1)/deg
+    weights_1d[0] /= 2
+    weights_1d[deg] /= 2
+    weights = weights_1d
+    for _ in range(dim-1):
+        weights = np.multiply.outer(weights, weights_1d)
+    weights.setflags(write=False)
+    return weights
+
+def full_cheb_approximate(f, a, b, deg, abs_approx_tol, rel_approx_tol, good_deg=None,
+                          values_block=None):
     """Gives the full chebyshev approximation and checks if it's good enough.
 
     Parameters
@@ -493,6 +504,9 @@ def full_cheb_approximate(f, a, b, deg, abs_approx_tol, rel_approx_tol, good_deg
     good_deg : numpy array
         Interpoation degree that is guaranteed to give an approximation valid
         to within approx_tol.
+    values_block : numpy array (optional)
+        The values of f on the degree 2*good_deg chebyshev grid on [a, b], if
+        they have already been computed.
 
     Returns
     -------
@@ -502,22 +516,69 @@ def full_cheb_approximate(f, a, b, deg, abs_approx_tol, rel_approx_tol, good_deg
     inf_norm : float
         The inf norm of f on [a, b]
     error : float
-        The approximation error
+        The approximation error. If the approximation isn't good enough, the
+        sum stops as soon as it passes the tolerance, so this is only a lower
+        bound on the error.
     """
     # We don't know what degree we want
     if good_deg is None:
         good_deg = deg
-    # Try degree deg and see if it's good enough
-    coeff = interval_approximate_nd(f, a, b, good_deg)
-    coeff2, inf_norm = interval_approximate_nd(f, a, b, good_deg*2, return_inf_norm=True)
+    # Try degree deg and see if it's good enough. The degree deg chebyshev grid
+    # is every other point of the degree 2*deg grid, so f is only evaluated once.
+    coeff2, inf_norm, values_block = interval_approximate_nd(f, a, b, good_deg*2, return_inf_norm=True,
+                                                             values_block=values_block, return_values=True)
+    coeff = interval_approximate_nd(f, a, b, good_deg, values_block=values_block[every_other_slicer(len(a))])
     coeff2[slice_top(coeff.shape)] -= coeff
 
-    error = np.sum(np.abs(coeff2))
-    if error > abs_approx_tol+rel_approx_tol*inf_norm:
+    allowed_error = abs_approx_tol+rel_approx_tol*inf_norm
+    error = capped_abs_sum(coeff2.reshape(-1), allowed_error)
+    if error > allowed_error:
         return None, inf_norm, error
     else:
         return coeff, inf_norm, error
 
+@jit(nopython=True, cache=True)
+def capped_abs_sum(values, cap):
+    """Sums the absolute values of an array in a single pass, stopping as soon
+    as the sum is larger than cap.
+
+    Parameters
+    ----------
+    values : numpy array
+        The one dimensional array to sum.
+    cap : float
+        The sum is only computed until it passes this value.
+
+    Returns
+    -------
+    total : float
+        The sum of the absolute values if it is at most cap. Otherwise a
+        partial sum that is larger than cap.
+    """
+    total = 0.
+    for i in range(values.size):
+        total += abs(values[i])
+        if total > cap:
+            break
+    return total
+
+
+@memoize
+def every_other_slicer(dim):
+    """Helper function for full_cheb_approximate. Builds the slice object that
+    picks the degree deg chebyshev grid out of the degree 2*deg grid.
+
+    Parameters
+    ----------
+    dim : int
+        The interpolation dimension.
+
+    Returns
+    -------
+    slicer : tuple of slice objects
+        Takes every other entry along each dimension
+    """
+    return (slice(None, None, 2),)*dim
 
 def zeros_in_interval(zeros, a, b, dim, within_interval_tol=1e-9):
     """Returns the zeros that are only in the interval [a, b].
@@ -564,14 +625,66 @@ def good_zeros_nd(zeros, imag_tol, real_tol):
     good_zeros : numpy array
         The real zeros in [-1, 1]^n of the input zeros.
     """
-    # Take care of the case where we found only 1 root
-    if len(zeros.shape) == 1:
-        mask = np.all(np.abs(zeros.imag) <= imag_tol, axis = 0)
-        mask *= np.all(np.abs(zeros.real) <= 1 + real_tol, axis = 0)
-    else:
-        mask = np.all(np.abs(zeros.imag) <= imag_tol, axis = 1)
-        mask *= np.all(np.abs(zeros.real) <= 1 + real_tol, axis = 1)
-    return zeros[mask].real
+    # Reducing over the last axis also takes care of the case where we found
+    # only 1 root. Both conditions are checked in a single reduction.
+    real = zeros.real
+    mask = np.all((np.abs(zeros.imag) <= imag_tol) & (np.abs(real) <= 1 + real_tol), axis=-1)
+    return real[mask]
+
+def buffer_interval(a, b):
+    """Buffers an interval to solve on a larger interval to account for
+    corners. Right now, it's set to be 5e-10 so that on [-1, 1], the buffer goes
+    out 1e-9 around the initial search interval.
+    DETERMINED BY EXPERIMENTATION
+
+    Parameters
+    ----------
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+
+    Returns
+    -------
+    a : numpy array
+        The lower bound on the buffered interval.
+    b : numpy array
+        The upper bound on the buffered interval.
+    """
+    interval_buffer_size = (b - a) * 5e-10
+    return a - interval_buffer_size, b + interval_buffer_size
+
+def batch_values_blocks(func, intervals, deg):
+    """Evaluates a function on the chebyshev grid of each of the buffered
+    intervals with a single call, so a vectorized function gets one large
+    array instead of one small array per interval.
+
+    Functions with an evaluate_grid method take the axes of a single grid, so
+    they are left to be evaluated one interval at a time.
+
+    Parameters
+    ----------
+    func : function
+        The function to evaluate.
+    intervals : list
+        Each element is a tuple containing an a and b, the lower and upper
+        bounds of the interval before buffering.
+    deg : int
+        The degree of the chebyshev grid.
+
+    Returns
+    -------
+    values_blocks : list
+        The values of func on the chebyshev grid of each buffered interval, or
+        None for each interval if func has an evaluate_grid method.
+    """
+    if hasattr(func, "evaluate_grid") or len(intervals) == 0:
+        return [None]*len(intervals)
+    dim = len(intervals[0][0])
+    cheb_grid = get_cheb_grid(deg, dim, False)
+    cheb_points = np.vstack([transform(cheb_grid, *buffer_interval(new_a, new_b))
+                             for new_a, new_b in intervals])
+    return func(*cheb_points.T).reshape(len(intervals), *([deg+1]*dim))
 
 def get_abs_approx_tol(func, deg, a, b, dim):
     """ Gets an absolute approximation tolerance based on the assumption that
@@ -662,7 +775,7 @@ def random_point(dim):
 def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
                          root_tracker, tols, max_level,good_degs=None, level=0,
                          method='svd', use_target_tol=False,
-                         trust_small_evals=False):
+                         trust_small_evals=False, values_block=None):
     """Finds the common zeros of the given functions.
 
     All the zeros will be stored in root_tracker.
@@ -700,6 +813,9 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
         Whether or not to use tols.target_tol when making approximations. This
         is necessary to get a sufficiently accurate approximation from which to
         build the Macaulay matrix and run the solver.
+    values_block : numpy array (optional)
+        The values of funcs[0] on the chebyshev grid of the buffered interval
+        that full_cheb_approximate uses, if the parent already computed them.
     """
 
     if level >= max_level:
@@ -727,15 +843,10 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
                 for func in funcs:
                     tols.target_tol = max(tols.target_tol, numSpots * get_abs_approx_tol(func, 3, a, b, dim))
 
-    # Buffer the interval to solve on a larger interval to account for
-    # corners. Right now, it's set to be 5e-10 so that on [-1, 1], the
-    # buffer goes out 1e-9 around the initial search interval.
-    # DETERMINED BY EXPERIMENTATION
-    interval_buffer_size = (b - a) * 5e-10
-    og_a = a.copy()
-    og_b = b.copy()
-    a -= interval_buffer_size
-    b += interval_buffer_size
+    # Buffer the interval to solve on a larger interval to account for corners
+    og_a = a
+    og_b = b
+    a, b = buffer_interval(og_a, og_b)
 
     cheb_approx_list = []
     interval_data.print_progress()
@@ -746,10 +857,12 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
     # Get the chebyshev approximations
     num_funcs = len(funcs)
     for func_num, (func, good_deg) in enumerate(zip(funcs, good_degs)):
+        if func_num > 0:
+            values_block = None
         if use_target_tol:
-            coeff, inf_norm, approx_error = full_cheb_approximate(func, a, b, deg, tols.target_tol, tols.rel_approx_tol, good_deg)
+            coeff, inf_norm, approx_error = full_cheb_approximate(func, a, b, deg, tols.target_tol, tols.rel_approx_tol, good_deg, values_block)
         else:
-            coeff, inf_norm, approx_error = full_cheb_approximate(func, a, b, deg, tols.abs_approx_tol, tols.rel_approx_tol, good_deg)
+            coeff, inf_norm, approx_error = full_cheb_approximate(func, a, b, deg, tols.abs_approx_tol, tols.rel_approx_tol, good_deg, values_block)
         inf_norms.append(inf_norm)
         approx_errors.append(approx_error)
         # Subdivides if a bad approximation
@@ -763,8 +876,9 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
             if func_num + 1 < num_funcs:
                 del funcs2[func_num]
                 funcs2.append(func)
-            for new_a, new_b in intervals:
-                subdivision_solve_nd(funcs2,new_a,new_b,deg,target_deg,interval_data,root_tracker,tols,max_level,level=level+1, method=method, trust_small_evals=trust_small_evals)
+            values_blocks = get_child_values_blocks(funcs2, intervals, deg, None, level, max_level)
+            for (new_a, new_b), values_block in zip(intervals, values_blocks):
+                subdivision_solve_nd(funcs2,new_a,new_b,deg,target_deg,interval_data,root_tracker,tols,max_level,level=level+1, method=method, trust_small_evals=trust_small_evals, values_block=values_block)
             return
         else:
             # Run checks to try and throw out the interval
@@ -790,14 +904,16 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
     # Check if the degree is small enough or if trim_coeffs introduced too much error
     if np.any(np.array([coeff.shape[0] for coeff in coeffs]) > target_deg + 1) or not good_approx:
         intervals = interval_data.get_subintervals(og_a, og_b, cheb_approx_list, approx_errors, True)
-        for new_a, new_b in intervals:
-            subdivision_solve_nd(funcs, new_a, new_b, deg, target_deg, interval_data, root_tracker, tols, max_level, good_degs, level+1, method=method, trust_small_evals=trust_small_evals, use_target_tol=True)
+        values_blocks = get_child_values_blocks(funcs, intervals, deg, good_degs, level, max_level)
+        for (new_a, new_b), values_block in zip(intervals, values_blocks):
+            subdivision_solve_nd(funcs, new_a, new_b, deg, target_deg, interval_data, root_tracker, tols, max_level, good_degs, level+1, method=method, trust_small_evals=trust_small_evals, use_target_tol=True, values_block=values_block)
 
     # Check if any approx error is greater than target_tol for Macaulay method
     elif np.any(np.array(approx_errors) > np.array(tols.target_tol) + tols.rel_approx_tol*np.array(inf_norms)):
         intervals = interval_data.get_subintervals(og_a, og_b, cheb_approx_list, approx_errors, True)
-        for new_a, new_b in intervals:
-            subdivision_solve_nd(funcs, new_a, new_b, deg, target_deg, interval_data, root_tracker, tols, max_level, good_degs, level+1, method=method, trust_small_evals=trust_small_evals, use_target_tol=True)
+        values_blocks = get_child_values_blocks(funcs, intervals, deg, good_degs, level, max_level)
+        for (new_a, new_b), values_block in zip(intervals, values_blocks):
+            subdivision_solve_nd(funcs, new_a, new_b, deg, target_deg, interval_data, root_tracker, tols, max_level, good_degs, level+1, method=method, trust_small_evals=trust_small_evals, use_target_tol=True, values_block=values_block)
 
     # Check if everything is linear
     elif np.all(np.array([coeff.shape[0] for coeff in coeffs]) == 2):
@@ -820,8 +936,9 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
         if res[0] is None:
             # Subdivide but run some checks on the intervals first
             intervals = interval_data.get_subintervals(og_a, og_b, cheb_approx_list, approx_errors, True)
-            for new_a, new_b in intervals:
-                subdivision_solve_nd(funcs, new_a, new_b, deg, target_deg, interval_data, root_tracker, tols, max_level, good_degs, level+1, method=method, trust_small_evals=trust_small_evals, use_target_tol=True)
+            values_blocks = get_child_values_blocks(funcs, intervals, deg, good_degs, level, max_level)
+            for (new_a, new_b), values_block in zip(intervals, values_blocks):
+                subdivision_solve_nd(funcs, new_a, new_b, deg, target_deg, interval_data, root_tracker, tols, max_level, good_degs, level+1, method=method, trust_small_evals=trust_small_evals, use_target_tol=True, values_block=values_block)
         else:
             zeros = res
             zeros = good_zeros_nd(zeros, good_zeros_tol, good_zeros_tol)
@@ -830,6 +947,36 @@ def subdivision_solve_nd(funcs, a, b, deg, target_deg, interval_data,
             interval_data.track_interval("Macaulay", [a, b])
             root_tracker.add_roots(zeros, a, b, "Macaulay")
 
+def get_child_values_blocks(funcs, intervals, deg, good_degs, level, max_level):
+    """Helper function for subdivision_solve_nd. Evaluates the first function
+    each subinterval will approximate on all of the subintervals at once.
+
+    Parameters
+    ----------
+    funcs : list
+        The functions that will be passed to the subintervals.
+    intervals : list
+        The subintervals, as tuples of lower and upper bounds.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    good_degs : numpy array
+        The good_degs that will be passed to the subintervals.
+    level : int
+        The current level of the recursion.
+    max_level : int
+        The maximum level for the recursion
+
+    Returns
+    -------
+    values_blocks : list
+        The values_block to pass to each subinterval.
+    """
+    # Subintervals that are too deep never approximate anything
+    if level + 1 >= max_level:
+        return [None]*len(intervals)
+    good_deg = deg if good_degs is None or good_degs[0] is None else good_degs[0]
+    return batch_values_blocks(funcs[0], intervals, 2*good_deg)
+
 def trim_coeffs(coeffs, abs_approx_tol, rel_approx_tol, inf_norms, errors):
     """Trim the coefficient matrices to reduce the degree by zeroing out any
     entries in the coefficient matrix above a certain degree.
@@ -858,117 +1005,92 @@ def trim_coeffs(coeffs, abs_approx_tol, rel_approx_tol, inf_norms, errors):
     # Assume we start with good approximations
     good_approx = True
     for num, coeff in enumerate(coeffs):
-        # Get the error inherent in the approximation
-        error = errors[num]
-
-        # Try to zero out everything below the lower-reverse-hyperdiagonal
-        # that's a fancy way of saying monomials that are more than the specified degree
+        allowed_error = abs_approx_tol+rel_approx_tol*inf_norms[num]
+        coeff = np.ascontiguousarray(coeff)
         dim = coeff.ndim
-        deg = np.sum(coeff.shape) - dim
-        initial_mons = []
-        for deg0 in range(coeff.shape[0], deg+1):
-            initial_mons += mon_combos_limited_wrap(deg0, dim, coeff.shape)
-        mons = np.array(initial_mons).T
-        slices = tuple(mons[:dim])
-        slice_error = np.sum(np.abs(coeff[slices]))
-        # increment error
-        error += slice_error
-        if error > abs_approx_tol+rel_approx_tol*inf_norms[num]:
+        # Zero out the hyperdiagonals on the flattened view of the coefficients
+        deg, error = trim_hyperdiagonals(coeff.reshape(-1), mon_degrees(coeff.shape)[1],
+                                         coeff.shape[0]-1, errors[num], allowed_error)
+        if deg < 0:
             # FREAK OUT if we can't zero out everything below the lower-reverse-hyperdiagonal
             good_approx = False
-        else:
-            # try to increment the degree down
-            coeff[slices] = 0
-            deg = coeff.shape[0]-1
-            # stop when it gets linear...
-            while deg > 1:
-                # try to cut off another hyperdiagonal from the coefficient matrix
-                mons = mon_combos_limited_wrap(deg, dim, coeff.shape)
-                mons = np.array(mons).T
-                slices = tuple(mons[:dim])
-                slice_error = np.sum(np.abs(coeff[slices]))
-                # if that introduces too much error, backtrack
-                if slice_error + error > abs_approx_tol+rel_approx_tol*inf_norms[num]:
-                    if deg < coeff.shape[0]-1:
-                        slices = tuple([slice(0, deg+1)]*dim)
-                        coeff = coeff[slices]
-                    break
-                # otherwise, increment the error
-                else:
-                    error += slice_error
-                    coeff[slices] = 0
-                    deg-=1
-                    if deg == 1:
-                        slices = tuple([slice(0, 2)]*dim)
-                        coeff = coeff[slices]
-                        break
+        elif deg < coeff.shape[0]-1:
+            coeff = coeff[tuple([slice(0, deg+1)]*dim)]
         coeffs[num] = coeff
         errors[num] = error
 
     return coeffs, good_approx, errors
 
-@memoize
-def mon_combos_limited_wrap(deg, dim, shape):
-    """A wrapper for mon_combos_limited to memoize.
+@jit(nopython=True, cache=True)
+def trim_hyperdiagonals(coeff, degrees, deg, error, allowed_error):
+    """Helper function for trim_coeffs. Zeros out the hyperdiagonals of a
+    coefficient tensor, from the highest degree down, for as long as the error
+    they introduce stays within the allowed error.
 
     Parameters
-    --------
-    deg: int
-        Degree of the monomials desired.
-    dim : int
-        Dimension of the monomials desired.
-    shape : tuple
-        The limiting shape. The i'th index of the mon can't be bigger than the
-        i'th index of the shape.
+    ----------
+    coeff : numpy array
+        The flattened coefficient tensor. Modified in place.
+    degrees : numpy array
+        The total degree of each entry of coeff.
+    deg : int
+        The degree of the approximation. Everything of higher total degree is
+        below the lower-reverse-hyperdiagonal and must be zeroed out.
+    error : float
+        The error already in the approximation.
+    allowed_error : float
+        The most error the approximation can have.
 
     Returns
-    -----------
-    mon_combo_limited_wrap : list
-        A list of all the monomials.
+    -------
+    deg : int
+        The degree of the trimmed approximation, or -1 if the entries of total
+        degree above deg can't be zeroed out. In that case coeff is unchanged.
+    error : float
+        The error of the trimmed approximation.
     """
-    return mon_combos_limited([0]*dim, deg, shape)
+    # Sum the absolute values of each hyperdiagonal in one pass
+    slice_errors = np.zeros(degrees.max()+1)
+    for i in range(coeff.size):
+        slice_errors[degrees[i]] += abs(coeff[i])
+
+    # Try to zero out everything below the lower-reverse-hyperdiagonal
+    # that's a fancy way of saying monomials that are more than the specified degree
+    error += slice_errors[deg+1:].sum()
+    if error > allowed_error:
+        return -1, error
 
-def mon_combos_limited(mon, remaining_degrees, shape, cur_dim = 0):
-    """Finds all the monomials of a given degree that fits in a given shape and
-     returns them. Works recursively.
+    # try to increment the degree down, stopping when it gets linear...
+    while deg > 1 and slice_errors[deg] + error <= allowed_error:
+        error += slice_errors[deg]
+        deg -= 1
 
-    Very similar to mon_combos, but only returns the monomials of the desired
-    degree.
+    for i in range(coeff.size):
+        if degrees[i] > deg:
+            coeff[i] = 0
+    return deg, error
+
+@memoize
+def mon_degrees(shape):
+    """Helper function for trim_coeffs. Finds every monomial that fits in a
+    given shape along with its total degree.
 
     Parameters
     --------
-    mon: list
-        A list of zeros, the length of which is the dimension of the desired
-        monomials. Will change as the function searches recursively.
-    remaining_degrees : int
-        Initially the degree of the monomials desired. Will decrease as the
-        function searches recursively.
     shape : tuple
         The limiting shape. The i'th index of the mon can't be bigger than the
         i'th index of the shape.
-    cur_dim : int
-        The current position in the list the function is iterating through.
-        Defaults to 0, but increases in each step of the recursion.
 
     Returns
     -----------
-    answers : list
-        A list of all the monomials.
+    mons : numpy array
+        Each column is the exponent of a monomial, in the order of the
+        flattened shape.
+    degrees : numpy array
+        The total degree of each monomial.
     """
-    answers = []
-    if len(mon) == cur_dim+1: # We are at the end of mon, no more recursion.
-        if remaining_degrees < shape[cur_dim]:
-            mon[cur_dim] = remaining_degrees
-            answers.append(mon.copy())
-        return answers
-    if remaining_degrees == 0: # Nothing else can be added.
-        answers.append(mon.copy())
-        return answers
-    temp = mon.copy() # Quicker than copying every time inside the loop.
-    for i in range(min(shape[cur_dim], remaining_degrees+1)): # Recursively add to mon further down.
-        temp[cur_dim] = i
-        answers.extend(mon_combos_limited(temp, remaining_degrees-i, shape, cur_dim+1))
-    return answers
+    mons = np.indices(shape).reshape(len(shape), -1)
+    return mons, mons.sum(axis=0)
 
 def good_zeros_1d(zeros, imag_tol, real_tol):
     """Get the real zeros in the -1 to 1 interval
@@ -998,6 +1120,9 @@ def subdivision_solve_1d(f, a, b, deg, target_deg, interval_data, root_tracker,
     """Finds the roots of a one-dimensional function using subdivision and
     chebyshev approximation.
 
+    The subintervals are kept on a stack and solved in the same order a
+    depth first recursion would solve them.
+
     Parameters
     ----------
     f : function from R -> R
@@ -1017,42 +1142,45 @@ def subdivision_solve_1d(f, a, b, deg, target_deg, interval_data, root_tracker,
     tols : Tolerances
         The tolerances to be used.
     max_level : int
-        The maximum level for the recursion
+        The maximum level for the subdivision
     level : int
-        The current level of the recursion.
-
-    Returns
-    -------
-    coeffs : numpy array
-        The coefficient of the chebyshev interpolating polynomial.
+        The level of the initial interval.
     """
-    if level > max_level:
-        # TODO Refine case where there may be a root and it goes too deep.
-        interval_data.track_interval("Too Deep", [a, b])
-        return
-
-
     # Determine the point at which to subdivide the interval
     RAND = 0.5139303900908738
-    interval_data.print_progress()
-
-    # Approximate the function using Chebyshev polynomials
-    coeff = interval_approximate_1d(f, a, b, deg)
-    coeff2, sign_change, inf_norm = interval_approximate_1d(f, a, b, deg*2, return_bools=True, return_inf_norm=True)
-
-    coeff2[slice_top(coeff.shape)] -= coeff
 
-    # Calculate the approximate error between the deg and 2*deg approximations
-    error = np.sum(np.abs(coeff2))
-    allowed_error = tols.abs_approx_tol+tols.rel_approx_tol*inf_norm
+    # Each entry is (a, b, degree to approximate with, level)
+    intervals = deque([(a, b, deg, level)])
+    while intervals:
+        a, b, deg, level = intervals.pop()
+        if level > max_level:
+            # TODO Refine case where there may be a root and it goes too deep.
+            interval_data.track_interval("Too Deep", [a, b])
+            continue
+
+        interval_data.print_progress()
+
+        # Approximate the function using Chebyshev polynomials. The degree deg
+        # chebyshev extrema are every other degree 2*deg extrema, so f is only
+        # evaluated once.
+        values = f(transform(get_cheb_values(deg*2), a, b))
+        coeff = interval_approximate_1d(f, a, b, deg, values=values[::2])
+        coeff2, sign_change, inf_norm = interval_approximate_1d(f, a, b, deg*2, return_bools=True, return_inf_norm=True, values=values)
+
+        coeff2[slice_top(coeff.shape)] -= coeff
+
+        # Calculate the approximate error between the deg and 2*deg approximations
+        allowed_error = tols.abs_approx_tol+tols.rel_approx_tol*inf_norm
+        error = capped_abs_sum(coeff2, allowed_error)
+
+        if error > allowed_error:
+            # Subdivide the interval, pushing the right half first so the left
+            # half is solved first.
+            div_spot = a + (b-a)*RAND
+            intervals.append((div_spot, b, deg, level+1))
+            intervals.append((a, div_spot, deg, level+1))
+            continue
 
-    if error > allowed_error:
-        # Subdivide the interval and recursively call the function.
-        div_spot = a + (b-a)*RAND
-        good_deg = deg
-        subdivision_solve_1d(f, a, div_spot, good_deg, target_deg, interval_data, root_tracker, tols, max_level, level+1)
-        subdivision_solve_1d(f, div_spot, b, good_deg, target_deg, interval_data, root_tracker, tols, max_level, level+1)
-    else:
         # Trim the coefficient array (reduce the degree) as much as we can.
         # This identifies a 'good degree' with which to approximate the function
         # if it is less than the given approx degree.
@@ -1073,7 +1201,7 @@ def subdivision_solve_1d(f, a, b, deg, target_deg, interval_data, root_tracker,
         # Run interval checks to eliminate regions
         if not sign_change: # Skip checks if there is a sign change
             if interval_data.check_interval(coeff, error, a, b):
-                return
+                continue
 
         try:
             good_zeros_tol = max(tols.min_good_zeros_tol, error*tols.good_zeros_factor)
@@ -1081,6 +1209,7 @@ def subdivision_solve_1d(f, a, b, deg, target_deg, interval_data, root_tracker,
             interval_data.track_interval("Macaulay", [a, b])
             root_tracker.add_roots(zeros, a, b, "Macaulay")
         except (ConditioningError, TooManyRoots) as e:
+            # Subdivide, approximating the halves with the good degree
             div_spot = a + (b-a)*RAND
-            subdivision_solve_1d(f, a, div_spot, good_deg, target_deg, interval_data, root_tracker, tols, max_level, level+1)
-            subdivision_solve_1d(f, div_spot, b, good_deg, target_deg, interval_data, root_tracker, tols, max_level, level+1)
+            intervals.append((div_spot, b, good_deg, level+1))
+            intervals.append((a, div_spot, good_deg, level+1))
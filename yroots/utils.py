@@ -420,7 +420,7 @@ def solve_linear(coeffs):
                 A[row,col] = coeff[var_list[col]]
     #solve the system
     try:
-        return np.linalg.solve(A,-B), np.nan
+        return solve_small(A,-B), np.nan
     except np.linalg.LinAlgError as e:
         if str(e) == 'Singular matrix':
             #if the system is dependent, then there are infinitely many roots
@@ -439,6 +439,79 @@ def solve_linear(coeffs):
         else:
             raise e
 
+def solve_small(A, B):
+    """Solves the linear system AX = B. Uses Gaussian elimination with partial
+    pivoting on Python floats for 2x2 and 3x3 systems, where the overhead of
+    calling LAPACK is much larger than the arithmetic, and np.linalg.solve
+    otherwise. Partial pivoting is what LAPACK does too, so the small case is
+    just as backward stable.
+
+    Parameters
+    ----------
+    A : numpy array
+        The square coefficient matrix.
+    B : numpy array
+        The right hand side.
+
+    Returns
+    -------
+    X : numpy array
+        The solution to the system.
+
+    Raises
+    ------
+    np.linalg.LinAlgError
+        With the message 'Singular matrix' if A is singular, like
+        np.linalg.solve.
+    """
+    dim = A.shape[0]
+    # Python floats are much faster than numpy scalars for this arithmetic
+    if dim == 2:
+        (a, b), (c, d) = A.tolist()
+        x0, x1 = B.tolist()
+        if abs(c) > abs(a):
+            a, b, x0, c, d, x1 = c, d, x1, a, b, x0
+        if a == 0:
+            raise np.linalg.LinAlgError('Singular matrix')
+        l = c/a
+        d -= l*b
+        x1 -= l*x0
+        if d == 0:
+            raise np.linalg.LinAlgError('Singular matrix')
+        y = x1/d
+        return np.array([(x0 - b*y)/a, y])
+    elif dim == 3:
+        rows = [row + [x] for row, x in zip(A.tolist(), B.tolist())]
+        # Eliminate the first column, pivoting on its largest entry
+        rows.sort(key=lambda row: -abs(row[0]))
+        (a, b, c, x0), (d, e, f, x1), (g, h, i, x2) = rows
+        if a == 0:
+            raise np.linalg.LinAlgError('Singular matrix')
+        l1 = d/a
+        l2 = g/a
+        e -= l1*b
+        f -= l1*c
+        x1 -= l1*x0
+        h -= l2*b
+        i -= l2*c
+        x2 -= l2*x0
+        # Eliminate the second column of the remaining 2x2 block
+        if abs(h) > abs(e):
+            e, f, x1, h, i, x2 = h, i, x2, e, f, x1
+        if e == 0:
+            raise np.linalg.LinAlgError('Singular matrix')
+        l = h/e
+        i -= l*f
+        x2 -= l*x1
+        if i == 0:
+            raise np.linalg.LinAlgError('Singular matrix')
+        # Back substitution
+        z = x2/i
+        y = (x1 - f*z)/e
+        return np.array([(x0 - b*y - c*z)/a, y, z])
+    else:
+        return np.linalg.solve(A, B)
+
 def first_x(string):
     '''
     Finds the first position of an 'x' in a string. If there is not x it returns the length